@@ -7,6 +7,7 @@ Now supports data.tar and various tar format patching.
 """
 
 import os
+import errno
 import json
 import asyncio
 import aiohttp
@@ -17,7 +18,6 @@ import subprocess
 import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import hashlib
 import time
@@ -25,6 +25,14 @@ import sys
 from urllib.parse import urlparse
 import argparse
 import tarfile
+import zlib
+import copy
+import contextlib
+import mmap
+import struct
+from collections import deque
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 
 # Attempt to import LIEF, which is required for patching
 try:
@@ -33,6 +41,44 @@ try:
 except ImportError:
     LIEF_AVAILABLE = False
 
+# orjson is optional; it serializes the progress event stream several times faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# uvloop is optional (POSIX only); it replaces the default event loop with libuv's
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# zstandard is optional; newer dpkg builds default to data.tar.zst members
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+AR_MAGIC = b'!<arch>\n'
+# Asset types that are already compressed and are stored as-is when building an IPA
+STORED_EXTS = {'.png', '.jpg', '.jpeg', '.mp4', '.m4a', '.mov', '.ogg', '.car', '.webp', '.heic', '.mp3', '.zip'}
+# Mach-O constants used by the in-place LC_LOAD_DYLIB appender
+FAT_MAGIC, FAT_MAGIC_64 = 0xcafebabe, 0xcafebabf
+MH_MAGIC, MH_MAGIC_64 = 0xfeedface, 0xfeedfacf
+LC_SEGMENT, LC_SEGMENT_64 = 0x1, 0x19
+LC_LOAD_DYLIB = 0xc
+CPU_TYPE_ARM, CPU_TYPE_ARM64 = 0xc, 0x0100000c
+DYLIB_LOAD_COMMANDS = {LC_LOAD_DYLIB, 0x80000018, 0x8000001f, 0x20, 0x80000023}  # plus weak, reexport, lazy, upward
+# Files up to this size are read whole and deflated on the thread pool; larger ones stream through zipfile
+PARALLEL_DEFLATE_MAX = 8 * 1024 * 1024
+# Tar members up to this size are read whole and written with raw fd calls (on the write pool when --extract-concurrency > 1)
+PARALLEL_WRITE_MAX = 1024 * 1024
+# Python 3.12+ (and security backports) warn unless an extraction filter is given; 'tar' still allows absolute symlinks found in debs
+TAR_EXTRACT_KWARGS = {'filter': 'tar'} if hasattr(tarfile, 'tar_filter') else {}
+
 class EnhancedLogger:
     """Enhanced logging system with file and console output"""
     def __init__(self, name: str, log_dir: str = "logs"):
@@ -55,24 +101,49 @@ class EnhancedLogger:
         ch.setLevel(logging.INFO)
         self.logger.addHandler(ch)
 
-    def log(self, level, msg, **kwargs): self.logger.log(level, f"{msg}" + (f" | {kwargs}" if kwargs else ""))
-    def debug(self, msg, **kwargs): self.log(logging.DEBUG, msg, **kwargs)
-    def info(self, msg, **kwargs): self.log(logging.INFO, msg, **kwargs)
-    def warning(self, msg, **kwargs): self.log(logging.WARNING, msg, **kwargs)
-    def error(self, msg, **kwargs): self.log(logging.ERROR, msg, **kwargs)
+    def log(self, level, msg, *args, exc_info=False, **kwargs):
+        # %-style args are formatted by logging when the record is emitted; with args present the kwargs
+        # suffix goes in as one more argument so a '%' inside it is never read as a format directive
+        if kwargs and args: msg, args = f"{msg} | %s", (*args, kwargs)
+        elif kwargs: msg = f"{msg} | {kwargs}"
+        self.logger.log(level, msg, *args, exc_info=exc_info)
+    def debug(self, msg, *args, **kwargs): self.log(logging.DEBUG, msg, *args, **kwargs)
+    def info(self, msg, *args, **kwargs): self.log(logging.INFO, msg, *args, **kwargs)
+    def warning(self, msg, *args, **kwargs): self.log(logging.WARNING, msg, *args, **kwargs)
+    def error(self, msg, *args, **kwargs): self.log(logging.ERROR, msg, *args, **kwargs)
+
+class ConversionResult(Enum):
+    """Outcome of convert_deb_to_ipa; a tweak is a normal result, not an error"""
+    CONVERTED = 'converted'
+    TWEAK_DETECTED = 'tweak_detected'
+
+class ArMemberReader:
+    """Read-only stream over a single ar archive member, optionally teeing the bytes read to another file"""
+    def __init__(self, f, size: int, tee=None):
+        self._f, self._remaining, self._tee = f, size, tee
 
-class TweakDetectedException(Exception): pass
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0 or n > self._remaining: n = self._remaining
+        data = self._f.read(n)
+        self._remaining -= len(data)
+        if self._tee: self._tee.write(data)
+        return data
+
+    def drain(self):
+        while self.read(1 << 20): pass
 
 class DebMaster:
     def __init__(self, config_path: str = "debmaster_config.json"):
         self.config_path = config_path
         self.session = None
+        self._ts_cache = (0, '')
+        self._macho_cache: Dict[Tuple, object] = {}
         self.logger = EnhancedLogger('DebMaster')
         self.config = self._load_config()
         self.logger.info("DebMaster initializing", config=config_path)
         
     def _load_config(self) -> Dict:
-        default_config = {"download_dir": "./downloads", "output_dir": "./converted", "github_token": None}
+        default_config = {"download_dir": "./downloads", "output_dir": "./converted", "cache_dir": "./cache", "github_token": None}
         if Path(self.config_path).exists():
             try:
                 with open(self.config_path, 'r') as f: return {**default_config, **json.load(f)}
@@ -83,15 +154,29 @@ class DebMaster:
         return default_config
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(headers={'User-Agent': 'DebMaster/3.2'})
+        # Pooled keep-alive connector so repeated release/asset requests reuse TCP+TLS sessions
+        connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=75, enable_cleanup_closed=True)
+        self.session = aiohttp.ClientSession(connector=connector, headers={'User-Agent': 'DebMaster/3.2'},
+                                             timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60))
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session: await self.session.close()
     
     def _notify_progress(self, event_type: str, status: str, **kwargs):
-        message = {"type": event_type, "status": status, "timestamp": datetime.now().isoformat(), **kwargs}
-        print(json.dumps(message), flush=True)
+        # Timestamps have second resolution, so only re-format when the second changes
+        now = int(time.time())
+        if now != self._ts_cache[0]: self._ts_cache = (now, time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)))
+        message = {"type": event_type, "status": status, "timestamp": self._ts_cache[1], **kwargs}
+        # One write per event keeps lines intact when events come from worker threads
+        line = orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE) if ORJSON_AVAILABLE else None
+        # orjson has no ensure_ascii; main.js decodes each pipe chunk separately, so a multi-byte character split
+        # across reads would be mangled. Keep the output pure ASCII like json.dumps
+        if line is None or not line.isascii(): line = (json.dumps(message) + '\n').encode('ascii')
+        out = getattr(sys.stdout, 'buffer', None)
+        if out is None: out, line = sys.stdout, line.decode('ascii')  # text-only stdout (StringIO, embedded hosts)
+        out.write(line)
+        out.flush()
         self.logger.debug(f"Progress: {event_type} -> {status}", **kwargs)
     
     async def fetch_github_releases(self, repo_url: str):
@@ -99,13 +184,41 @@ class DebMaster:
             url_parts = urlparse(repo_url); path_parts = url_parts.path.strip('/').split('/')
             owner, repo = path_parts[0], path_parts[1]
             api_url = f"https://api.github.com/repos/{owner}/{repo}/releases"
-            async with self.session.get(api_url) as response:
-                if response.status == 200:
-                    self._notify_progress('github_releases', 'completed', releases=self._process_releases(await response.json()))
+            # Conditional request against the on-disk cache; GitHub 304s don't count against the rate limit
+            cache_file = Path(self.config['cache_dir']) / f"{owner}_{repo}.json"
+            cached = self._load_releases_cache(cache_file) if self.config.get('cache_releases', True) else {}
+            headers = {}
+            if cached.get('etag'): headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'): headers['If-Modified-Since'] = cached['last_modified']
+            async with self.session.get(api_url, headers=headers) as response:
+                if response.status == 304 and 'releases' in cached:
+                    self.logger.debug("GitHub releases not modified, using cache", repo=f"{owner}/{repo}")
+                    self._notify_progress('github_releases', 'completed', releases=cached['releases'])
+                elif response.status == 200:
+                    releases = self._process_releases(await response.json())
+                    if self.config.get('cache_releases', True):
+                        self._save_releases_cache(cache_file, {'etag': response.headers.get('ETag'),
+                                                               'last_modified': response.headers.get('Last-Modified'),
+                                                               'releases': releases})
+                    self._notify_progress('github_releases', 'completed', releases=releases)
                 else:
                     self._notify_progress('github', 'failed', error=f"GitHub API Error: {response.status}")
         except Exception as e: self._notify_progress('github', 'failed', error=str(e))
 
+    def _load_releases_cache(self, cache_file: Path) -> Dict:
+        if not cache_file.exists(): return {}
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f: return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable releases cache {cache_file}: {e}")
+            return {}
+
+    def _save_releases_cache(self, cache_file: Path, entry: Dict):
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f: json.dump(entry, f)
+        except Exception as e: self.logger.warning(f"Could not save releases cache: {e}")
+
     def _process_releases(self, releases: List[Dict]) -> List[Dict]:
         processed = []
         for r in releases:
@@ -122,65 +235,221 @@ class DebMaster:
             self._notify_progress('download', 'exists', filename=filename, download_url=download_url, path=str(file_path))
             return file_path
         self._notify_progress('download', 'started', filename=filename, download_url=download_url)
+        # Stream to disk in fixed-size chunks so memory stays bounded on multi-GB assets
         async with self.session.get(download_url) as response:
             response.raise_for_status()
-            with open(file_path, 'wb') as f: f.write(await response.read())
-        self._notify_progress('download', 'completed', filename=filename, download_url=download_url, path=str(file_path))
+            part_path = file_path.with_name(filename + '.part')
+            # Hash while the chunk is still hot instead of re-reading the file afterwards
+            digest = hashlib.sha256()
+            with open(part_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(1 << 16):
+                    digest.update(chunk)
+                    f.write(chunk)
+            part_path.replace(file_path)
+        self._notify_progress('download', 'completed', filename=filename, download_url=download_url, path=str(file_path), sha256=digest.hexdigest())
         return file_path
 
     async def download_and_convert(self, download_url: str):
         try:
             downloaded_path = await self.download_deb(download_url)
-            self.convert_deb_to_ipa(downloaded_path, download_url=download_url)
-        except TweakDetectedException as e: self.logger.info(str(e))
+            # Conversion is blocking extract/zip work; run it off the loop so concurrent downloads keep flowing
+            result = await asyncio.to_thread(self.convert_deb_to_ipa, downloaded_path, None, download_url)
+            if result is ConversionResult.TWEAK_DETECTED: self.logger.info("Halting: Tweak detected.")
         except Exception as e:
             self._notify_progress('operation', 'failed', download_url=download_url, error=str(e))
             raise
 
-    def convert_deb_to_ipa(self, deb_path: Path, output_name: str = None, download_url: str = None):
+    async def download_and_convert_many(self, download_urls: List[str]) -> List:
+        """Download and convert several .deb files concurrently, returning per-URL (deduplicated) results or exceptions"""
+        sem = asyncio.Semaphore(self.config.get('max_concurrent_downloads', 8))
+        # Downloads are keyed by basename, so URLs sharing one run in turn instead of racing on the same .part/.ipa
+        path_locks: Dict[str, asyncio.Lock] = {}
+        async def _one(url: str):
+            async with path_locks.setdefault(url.split('/')[-1], asyncio.Lock()), sem: await self.download_and_convert(url)
+        return await asyncio.gather(*(_one(u) for u in dict.fromkeys(download_urls)), return_exceptions=True)
+
+    def convert_deb_to_ipa(self, deb_path: Path, output_name: str = None, download_url: str = None) -> ConversionResult:
         temp_dir = tempfile.mkdtemp()
         temp_path = Path(temp_dir)
         data_tar_path = self._extract_deb(deb_path, temp_path)
-        app_bundle = self._find_app_bundle(temp_path)
+        app_bundle, is_tweak = self._classify_payload(temp_path)
         if app_bundle:
             output_path = Path(self.config['output_dir']) / (output_name or deb_path.stem + '.ipa')
             output_path.parent.mkdir(parents=True, exist_ok=True)
             payload_dir = temp_path / "Payload"; payload_dir.mkdir()
-            shutil.copytree(app_bundle, payload_dir / app_bundle.name)
+            self._move_tree(app_bundle, payload_dir / app_bundle.name)
             self._create_ipa(temp_path, output_path)
             self._notify_progress('conversion', 'completed', filename=deb_path.name, final_path=str(output_path), download_url=download_url)
             shutil.rmtree(temp_dir)
-        elif self._is_tweak(temp_path):
+            return ConversionResult.CONVERTED
+        elif is_tweak:
             self._notify_progress('tweak_detected', 'awaiting_ipa', filename=deb_path.name, download_url=download_url, tweak_path=str(data_tar_path))
-            raise TweakDetectedException("Halting: Tweak detected.")
+            return ConversionResult.TWEAK_DETECTED
         else:
             shutil.rmtree(temp_dir)
             raise Exception("No .app bundle found and not a recognized tweak structure.")
 
+    def _read_ar_members(self, deb_path: Path):
+        """Yield (name, size, file offset) for each member of a .deb (Unix ar) archive"""
+        with open(deb_path, 'rb') as f:
+            if f.read(len(AR_MAGIC)) != AR_MAGIC: raise ValueError(f"Not an ar archive: {deb_path.name}")
+            while True:
+                header = f.read(60)
+                if len(header) < 60: return
+                if header[58:60] != b'`\n': raise ValueError(f"Corrupt ar member header in {deb_path.name}")
+                name = header[:16].decode('ascii', errors='replace').strip().rstrip('/')
+                size = int(header[48:58])
+                offset = f.tell()
+                yield name, size, offset
+                f.seek(offset + size + (size & 1))  # members are 2-byte aligned
+
     def _extract_deb(self, deb_path: Path, extract_to: Path) -> Optional[Path]:
+        """Extract data.tar* from a .deb in one pass: the member is decompressed straight into tarfile
+        while a copy of the raw member is kept on disk for the tweak patching flow"""
+        try:
+            members = list(self._read_ar_members(deb_path))
+        except ValueError as e:
+            self.logger.warning(f"{e}, falling back to 7z")
+            return self._extract_deb_7z(deb_path, extract_to)
+        for name, size, offset in members:
+            if not name.startswith('data.tar'): continue
+            if name.endswith('.zst') and not ZSTD_AVAILABLE:
+                self.logger.warning("zstandard not installed, falling back to 7z for data.tar.zst")
+                return self._extract_deb_7z(deb_path, extract_to)
+            data_file = extract_to / name
+            with open(deb_path, 'rb') as f, open(data_file, 'wb') as raw_copy:
+                f.seek(offset)
+                member = ArMemberReader(f, size, tee=raw_copy)
+                stream = zstandard.ZstdDecompressor().stream_reader(member) if name.endswith('.zst') else member
+                try:
+                    with tarfile.open(fileobj=stream, mode='r|*') as tar: self._extract_tar_members(tar, extract_to)
+                except tarfile.TarError as e: raise Exception(f"Extraction failed: {e}")
+                member.drain()
+            return data_file
+        return None
+
+    def _extract_deb_7z(self, deb_path: Path, extract_to: Path) -> Optional[Path]:
         try:
             subprocess.run(['7z', 'x', str(deb_path), f'-o{extract_to}', '-y'], check=True, capture_output=True)
             for data_file in extract_to.glob('data.tar*'):
-                subprocess.run(['7z', 'x', str(data_file), f'-o{extract_to}', '-y'], check=True, capture_output=True)
+                # Stream the payload through tarfile (plain, gz/bz2/xz or zst) rather than a second 7z pass
+                if not self._extract_tar_archive(data_file, extract_to): raise Exception(f"Extraction failed: {data_file.name}")
                 return data_file # Return the path to the data.tar file
         except FileNotFoundError: raise Exception("7-Zip is not installed or not in system's PATH.")
         except subprocess.CalledProcessError as e: raise Exception(f"Extraction failed: {e.stderr.decode(errors='ignore')}")
         return None
 
+    def _extract_tar_members(self, tar: tarfile.TarFile, extract_to: Path):
+        """Extract a streaming tar member by member; regular files are copied in blocks of up to 1 MiB
+        instead of tarfile's 16 KiB, which cuts read/decompress calls on small-file-heavy payloads.
+        With extract_concurrency > 1, small files are read here and written by a thread pool so many
+        open/write/close calls are in flight at once (helps on network or slow-metadata storage)"""
+        # Directories known to exist, so deep trees don't re-issue mkdir/stat for the same parents on every file
+        dir_cache = {str(extract_to)}
+        dirs = []
+        workers = max(1, int(self.config.get('extract_concurrency', 1)))
+        with (ThreadPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext()) as pool:
+            pending, submitted = deque(), set()
+            for member in tar:
+                if not (member.isreg() or member.isdir()):
+                    # Links may point at files still queued on the pool; let those land before tarfile looks for them
+                    while pending: pending.popleft().result()
+                    submitted.clear()
+                    if member.issym() or member.islnk(): self._extract_link(member, extract_to, dir_cache)
+                    else: tar.extract(member, extract_to, **TAR_EXTRACT_KWARGS)
+                    continue
+                if TAR_EXTRACT_KWARGS: member = tarfile.tar_filter(member, str(extract_to))
+                target = os.path.normpath(os.path.join(extract_to, member.name))
+                if member.isdir():
+                    self._ensure_dir(target, dir_cache)
+                    dirs.append((target, member))
+                    continue
+                self._ensure_dir(os.path.dirname(target), dir_cache)
+                if target in submitted:
+                    # A path repeated in the archive must be written in archive order, so flush before rewriting it
+                    while pending: pending.popleft().result()
+                    submitted.clear()
+                if member.size <= PARALLEL_WRITE_MAX:
+                    # The tar stream can only be read sequentially, so read here and hand the write to the pool if any
+                    data = tar.extractfile(member).read() if member.size else b''
+                    if pool:
+                        submitted.add(target)
+                        pending.append(pool.submit(self._write_file, target, data, member.mode, member.mtime))
+                        if len(pending) > workers * 2: pending.popleft().result()
+                    else:
+                        self._write_file(target, data, member.mode, member.mtime)
+                else:
+                    # copyfileobj owns the buffer, so skip the BufferedWriter layer
+                    with tar.extractfile(member) as src, open(target, 'wb', buffering=0) as dst:
+                        shutil.copyfileobj(src, dst, min(member.size, 1 << 20))
+                    if member.mode is not None: os.chmod(target, member.mode)
+                    if member.mtime is not None: os.utime(target, (member.mtime, member.mtime))
+            while pending: pending.popleft().result()
+        # Like extractall: directory times and modes last (deepest first), once nothing more is written inside them
+        for target, member in sorted(dirs, key=lambda d: d[0], reverse=True):
+            if member.mtime is not None: os.utime(target, (member.mtime, member.mtime))
+            if member.mode is not None: os.chmod(target, member.mode)
+
+    def _extract_link(self, member: tarfile.TarInfo, extract_to: Path, dir_cache: set):
+        """Create a symlink or hardlink from a streaming tar. Where links can't be made (symlinks on Windows
+        without the privilege), copy the already extracted target instead; tarfile's own fallback would
+        re-read the target from the archive, which a non-seekable stream can't do"""
+        if TAR_EXTRACT_KWARGS: member = tarfile.tar_filter(member, str(extract_to))
+        target = os.path.normpath(os.path.join(extract_to, member.name))
+        self._ensure_dir(os.path.dirname(target), dir_cache)
+        if os.path.islink(target) or os.path.isfile(target): os.remove(target)
+        if member.issym(): source = os.path.normpath(os.path.join(os.path.dirname(target), member.linkname))
+        else: source = os.path.normpath(os.path.join(extract_to, member.linkname))
+        try:
+            if member.issym(): os.symlink(member.linkname, target)
+            else: os.link(source, target)
+            return
+        except (OSError, NotImplementedError) as e:
+            # Only copy from inside the extraction root; absolute links point at the device, not this host
+            if os.path.commonpath([os.path.abspath(extract_to), os.path.abspath(source)]) != os.path.abspath(extract_to):
+                self.logger.warning(f"Skipping link {member.name} -> {member.linkname}: {e}")
+            elif os.path.isfile(source): shutil.copy2(source, target)
+            elif os.path.isdir(source): shutil.copytree(source, target, symlinks=True, dirs_exist_ok=True)
+            else: self.logger.warning(f"Skipping link {member.name} -> {member.linkname}: {e}")
+
+    @staticmethod
+    def _write_file(target: str, data: bytes, mode: Optional[int], mtime: Optional[float] = None):
+        """Create a file with raw fd calls: no file object, no directory-check fstat, and chmod on the open fd"""
+        fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            view = memoryview(data)
+            while view: view = view[os.write(fd, view):]
+            if mode is not None and hasattr(os, 'fchmod'): os.fchmod(fd, mode)
+        finally: os.close(fd)
+        if mode is not None and not hasattr(os, 'fchmod'): os.chmod(target, mode)
+        if mtime is not None: os.utime(target, (mtime, mtime))
+
+    @staticmethod
+    def _ensure_dir(path: str, dir_cache: set):
+        if path in dir_cache: return
+        os.makedirs(path, exist_ok=True)
+        while path not in dir_cache:
+            dir_cache.add(path)
+            parent = os.path.dirname(path)
+            if parent == path: break
+            path = parent
+
     def _extract_tar_archive(self, tar_path: Path, extract_to: Path):
         """Enhanced tar extraction supporting various formats including data.tar"""
         self.logger.info(f"Extracting tar archive: {tar_path}")
         try:
-            # Try with tarfile first (handles most formats)
-            with tarfile.open(tar_path, 'r:*') as tar:
-                tar.extractall(extract_to)
-                self.logger.info(f"Successfully extracted {tar_path} using tarfile")
-                return True
+            # Streaming mode extracts member by member without building the full member index first
+            with open(tar_path, 'rb') as f:
+                stream = zstandard.ZstdDecompressor().stream_reader(f) if tar_path.suffix == '.zst' and ZSTD_AVAILABLE else f
+                with tarfile.open(fileobj=stream, mode='r|*') as tar:
+                    self._extract_tar_members(tar, extract_to)
+            self.logger.info(f"Successfully extracted {tar_path} using tarfile")
+            return True
         except Exception as e:
             self.logger.warning(f"tarfile extraction failed: {e}, trying 7z")
             
         try:
-            # Fallback to 7z
+            # Fallback to 7z for compression formats tarfile can't stream
             subprocess.run(['7z', 'x', str(tar_path), f'-o{extract_to}', '-y'], 
                          check=True, capture_output=True)
             self.logger.info(f"Successfully extracted {tar_path} using 7z")
@@ -189,26 +458,154 @@ class DebMaster:
             self.logger.error(f"Both tarfile and 7z extraction failed for {tar_path}: {e}")
             return False
 
-    def _find_app_bundle(self, search_path: Path) -> Optional[Path]:
-        for root, dirs, _ in os.walk(search_path):
-            if any(d.endswith('.app') for d in dirs): return Path(root) / next(d for d in dirs if d.endswith('.app'))
+    def _classify_payload(self, search_path: Path) -> Tuple[Optional[Path], bool]:
+        """Single scandir walk returning (first .app bundle or None, whether a tweak layout was seen)"""
+        is_tweak = False
+        # Breadth-first: bundles sit near the root (Applications/X.app), so deep Library/ trees are reached last
+        queue = deque([str(search_path)])
+        while queue:
+            current = queue.popleft()
+            try: entries = os.scandir(current)
+            except OSError: continue
+            with entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=False): continue
+                    if entry.name.endswith('.app'): return Path(entry.path), is_tweak
+                    if entry.name == "DynamicLibraries" and os.path.basename(current) == "MobileSubstrate" and not is_tweak:
+                        self.logger.info(f"Tweak structure found in: {os.path.dirname(current)}")
+                        is_tweak = True
+                    queue.append(entry.path)
+        return None, is_tweak
+
+    def _extract_zip_parallel(self, zip_path: Path, extract_to: Path):
+        """Extract a zip across worker threads, each with its own ZipFile handle; zlib releases the GIL while inflating"""
+        with zipfile.ZipFile(zip_path, 'r') as zf: infos = zf.infolist()
+        # Create directories up front so workers never race inside zipfile's makedirs
+        dirs = set()
+        for info in infos:
+            target = self._zip_target_path(info, extract_to)
+            dirs.add(target if info.is_dir() else os.path.dirname(target))
+        for d in sorted(dirs): os.makedirs(d, exist_ok=True)
+        workers = min(8, os.cpu_count() or 1)
+        def _worker(chunk):
+            with zipfile.ZipFile(zip_path, 'r') as zf:
+                for info in chunk: zf.extract(info, extract_to)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_worker, [infos[i::workers] for i in range(workers)]))
+
+    @staticmethod
+    def _zip_target_path(info: zipfile.ZipInfo, extract_to: Path) -> str:
+        """Path ZipFile.extract() writes an entry to, built with the same rules as ZipFile._extract_member"""
+        arcname = info.filename.replace('/', os.path.sep)
+        if os.path.altsep: arcname = arcname.replace(os.path.altsep, os.path.sep)
+        arcname = os.path.splitdrive(arcname)[1]
+        arcname = os.path.sep.join(x for x in arcname.split(os.path.sep) if x not in ('', os.path.curdir, os.path.pardir))
+        if os.path.sep == '\\': arcname = zipfile.ZipFile._sanitize_windows_name(arcname, os.path.sep)
+        return os.path.normpath(os.path.join(extract_to, arcname))
+
+    def _move_tree(self, src: Path, dst: Path):
+        """Move a directory within the scratch area with a single rename, copying only across filesystems"""
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try: os.rename(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV: raise
+            shutil.move(str(src), str(dst))
+
+    def _first_dylib(self, search_path: Path) -> Optional[Path]:
+        """Return the first .dylib found, checking each directory's files before descending"""
+        stack = [str(search_path)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it: entries = list(it)
+            except OSError: continue
+            for entry in entries:
+                if entry.name.endswith('.dylib') and entry.is_file(follow_symlinks=False): return Path(entry.path)
+            stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
         return None
 
-    def _is_tweak(self, search_path: Path) -> bool:
-        for root, dirs, _ in os.walk(search_path):
-            if "MobileSubstrate" in dirs and "DynamicLibraries" in os.listdir(Path(root) / "MobileSubstrate"):
-                self.logger.info(f"Tweak structure found in: {root}")
-                return True
-        return False
-
-    def _create_ipa(self, source_dir: Path, output_path: Path):
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as ipa:
-            payload_path = source_dir / "Payload"
-            for root, _, files in os.walk(payload_path):
-                for file in files:
-                    file_path = Path(root) / file
-                    arcname = file_path.relative_to(source_dir)
-                    ipa.write(file_path, arcname)
+    def _create_ipa(self, source_dir: Path, output_path: Path, source_ipa: Optional[Path] = None, modified: Optional[set] = None):
+        """Zip source_dir/Payload into output_path. When source_ipa is given, entries that are unchanged from it
+        (not listed in modified, by arcname or parent directory) are copied as raw compressed bytes"""
+        payload_path = source_dir / "Payload"
+        files = [Path(root) / file for root, _, names in os.walk(payload_path) for file in names]
+        modified = modified or set()
+        workers = min(8, os.cpu_count() or 1)
+        # zlib releases the GIL, so files are deflated on a thread pool while entries are written in walk order;
+        # the window of in-flight files keeps memory bounded
+        with zipfile.ZipFile(output_path, 'w') as ipa, ThreadPoolExecutor(max_workers=workers) as pool, \
+                (zipfile.ZipFile(source_ipa, 'r') if source_ipa else contextlib.nullcontext()) as src:
+            original = src.NameToInfo if src else {}
+            pending = deque()
+            def _write_next():
+                file_path, arcname, job = pending.popleft()
+                if isinstance(job, zipfile.ZipInfo):
+                    self._copy_raw_entry(ipa, src, job)
+                elif job is not None:
+                    self._write_deflated_entry(ipa, file_path, arcname, *job.result())
+                # Already-compressed assets gain nothing from deflate; store them and deflate the rest at a fast level
+                elif file_path.suffix.lower() in STORED_EXTS:
+                    ipa.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+                else:
+                    ipa.write(file_path, arcname, compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
+            for file_path in files:
+                arcname = file_path.relative_to(source_dir)
+                size = file_path.stat().st_size
+                orig_info = original.get(arcname.as_posix())
+                if orig_info is not None and orig_info.file_size == size and not orig_info.flag_bits & 0x1 \
+                        and not any(p in modified for p in (arcname.as_posix(), *(q.as_posix() for q in arcname.parents))):
+                    job = orig_info
+                elif file_path.suffix.lower() not in STORED_EXTS and size <= PARALLEL_DEFLATE_MAX:
+                    job = pool.submit(self._deflate_file, file_path)
+                else:
+                    job = None
+                pending.append((file_path, arcname, job))
+                if len(pending) > workers * 2: _write_next()
+            while pending: _write_next()
+
+    @staticmethod
+    def _copy_raw_entry(ipa: zipfile.ZipFile, src: zipfile.ZipFile, orig_info: zipfile.ZipInfo):
+        """Copy an entry's compressed bytes verbatim from another archive, skipping inflate + deflate"""
+        src.fp.seek(orig_info.header_offset)
+        fheader = struct.unpack(zipfile.structFileHeader, src.fp.read(zipfile.sizeFileHeader))
+        src.fp.seek(fheader[zipfile._FH_FILENAME_LENGTH] + fheader[zipfile._FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+        zinfo = copy.copy(orig_info)
+        zinfo.flag_bits &= ~0x08  # sizes go in the local header, no trailing data descriptor
+        zinfo.extra = zipfile._strip_extra(zinfo.extra, (1,))  # FileHeader re-adds a zip64 field if needed
+        ipa._writecheck(zinfo)
+        ipa._didModify = True
+        zinfo.header_offset = ipa.fp.tell()
+        ipa.fp.write(zinfo.FileHeader(zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT))
+        remaining = zinfo.compress_size
+        while remaining:
+            chunk = src.fp.read(min(remaining, 1 << 20))
+            if not chunk: raise EOFError(f"Truncated entry in source IPA: {zinfo.filename}")
+            ipa.fp.write(chunk)
+            remaining -= len(chunk)
+        ipa.filelist.append(zinfo)
+        ipa.NameToInfo[zinfo.filename] = zinfo
+        ipa.start_dir = ipa.fp.tell()
+
+    @staticmethod
+    def _deflate_file(file_path: Path) -> Tuple[bytes, int, int]:
+        with open(file_path, 'rb') as f: data = f.read()
+        compressor = zlib.compressobj(1, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush(), zlib.crc32(data), len(data)
+
+    @staticmethod
+    def _write_deflated_entry(ipa: zipfile.ZipFile, file_path: Path, arcname: Path, data: bytes, crc: int, size: int):
+        """Append an entry whose raw deflate stream was produced elsewhere (zipfile has no public API for this)"""
+        zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.CRC, zinfo.file_size, zinfo.compress_size = crc, size, len(data)
+        ipa._writecheck(zinfo)
+        ipa._didModify = True
+        zinfo.header_offset = ipa.fp.tell()
+        ipa.fp.write(zinfo.FileHeader(size > zipfile.ZIP64_LIMIT or len(data) > zipfile.ZIP64_LIMIT))
+        ipa.fp.write(data)
+        ipa.filelist.append(zinfo)
+        ipa.NameToInfo[zinfo.filename] = zinfo
+        ipa.start_dir = ipa.fp.tell()
     
     def _analyze_tweak_structure(self, tweak_path: Path) -> Dict:
         """Analyze the structure of extracted tweak to determine patching strategy"""
@@ -223,8 +620,11 @@ class DebMaster:
             'library_path': None
         }
         
+        # Suffix -> bucket dispatch; plists are classified by path, so lowercase each directory once
+        dispatch = {'.dylib': analysis['dylibs'], '.framework': analysis['frameworks'], '.bundle': analysis['bundles']}
         for root, dirs, files in os.walk(tweak_path):
             root_path = Path(root)
+            root_lower = root.lower()
             
             # Look for MobileSubstrate directory
             if "MobileSubstrate" in dirs:
@@ -236,27 +636,149 @@ class DebMaster:
             
             # Analyze files
             for file in files:
-                file_path = root_path / file
                 file_lower = file.lower()
-                
-                if file_lower.endswith('.dylib'):
-                    analysis['dylibs'].append(file_path)
-                elif file_lower.endswith('.framework'):
-                    analysis['frameworks'].append(file_path)
-                elif file_lower.endswith('.bundle'):
-                    analysis['bundles'].append(file_path)
-                elif file_lower.endswith('.plist') and 'preferences' in str(file_path).lower():
-                    analysis['preferences'].append(file_path)
-                elif file_lower.endswith('.plist') and any(x in str(file_path).lower() for x in ['filter', 'substrate']):
-                    analysis['substrate_filters'].append(file_path)
-                else:
-                    analysis['other_files'].append(file_path)
+                ext = os.path.splitext(file_lower)[1]
+                bucket = dispatch.get(ext)
+                if bucket is None and ext == '.plist':
+                    if 'preferences' in root_lower or 'preferences' in file_lower:
+                        bucket = analysis['preferences']
+                    elif any(x in root_lower or x in file_lower for x in ('filter', 'substrate')):
+                        bucket = analysis['substrate_filters']
+                (bucket if bucket is not None else analysis['other_files']).append(root_path / file)
         
         self.logger.info(f"Tweak analysis: {len(analysis['dylibs'])} dylibs, {len(analysis['frameworks'])} frameworks, {len(analysis['bundles'])} bundles")
         return analysis
 
-    def patch_ipa_with_data_tar(self, ipa_path_str: str, data_tar_path_str: str):
-        """Enhanced patching function that can handle data.tar and various tar formats"""
+    def _macho_slice_offsets(self, mm) -> List[int]:
+        """File offsets of each Mach-O header, handling fat (universal) containers"""
+        magic = struct.unpack_from('>I', mm, 0)[0]
+        if magic in (FAT_MAGIC, FAT_MAGIC_64):
+            nfat_arch = struct.unpack_from('>I', mm, 4)[0]
+            if magic == FAT_MAGIC:
+                return [struct.unpack_from('>5I', mm, 8 + i * 20)[2] for i in range(nfat_arch)]
+            return [struct.unpack_from('>IIQQII', mm, 8 + i * 32)[2] for i in range(nfat_arch)]
+        return [0]
+
+    def _plan_dylib_command(self, mm, header_off: int, dylib_path: str) -> Optional[Tuple[int, bytes]]:
+        """Return (insert offset, dylib_command bytes) for one slice, (0, b'') if the dylib is already
+        loaded, or None if the slice is unsupported or has no free space after its load commands"""
+        magic = struct.unpack_from('<I', mm, header_off)[0]
+        if magic == MH_MAGIC_64: header_size, align, seg_cmd, seg_fmt, sect_size, sect_off = 32, 8, LC_SEGMENT_64, '<16sQQQQIIII', 80, 48
+        elif magic == MH_MAGIC: header_size, align, seg_cmd, seg_fmt, sect_size, sect_off = 28, 4, LC_SEGMENT, '<16sIIIIIIII', 68, 40
+        else: return None
+        ncmds, sizeofcmds = struct.unpack_from('<II', mm, header_off + 16)
+        name = dylib_path.encode('utf-8')
+        # The first section with file data marks where load-command padding ends
+        data_start = len(mm) - header_off
+        off = header_off + header_size
+        for _ in range(ncmds):
+            cmd, cmdsize = struct.unpack_from('<II', mm, off)
+            if cmd in DYLIB_LOAD_COMMANDS:
+                name_off = struct.unpack_from('<I', mm, off + 8)[0]
+                if mm[off + name_off:off + cmdsize].split(b'\0', 1)[0] == name: return 0, b''
+            elif cmd == seg_cmd:
+                _, _, _, fileoff, filesize, _, _, nsects, _ = struct.unpack_from(seg_fmt, mm, off + 8)
+                if nsects == 0 and fileoff and filesize: data_start = min(data_start, fileoff)
+                for i in range(nsects):
+                    section_offset = struct.unpack_from('<I', mm, off + 8 + struct.calcsize(seg_fmt) + i * sect_size + sect_off)[0]
+                    if section_offset: data_start = min(data_start, section_offset)
+            off += cmdsize
+        cmdsize = (24 + len(name) + 1 + align - 1) & ~(align - 1)
+        command = struct.pack('<6I', LC_LOAD_DYLIB, cmdsize, 24, 2, 0x10000, 0x10000) + name.ljust(cmdsize - 24, b'\0')
+        insert_at = header_off + header_size + sizeofcmds
+        if insert_at + cmdsize > header_off + data_start or any(mm[insert_at:insert_at + cmdsize]): return None
+        return insert_at, command
+
+    def _try_fast_inject_dylib(self, binary_path: Path, dylib_path: str) -> bool:
+        """Append an LC_LOAD_DYLIB to every slice directly in the mapped file, without a LIEF rewrite.
+        The file is only modified if every slice has room; returns False so the caller can fall back to LIEF"""
+        try:
+            with open(binary_path, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mm:
+                slices = self._macho_slice_offsets(mm)
+                plans = [(header_off, self._plan_dylib_command(mm, header_off, dylib_path)) for header_off in slices]
+                if any(plan is None for _, plan in plans): return False
+                patched = 0
+                for header_off, (insert_at, command) in plans:
+                    if not command: continue
+                    mm[insert_at:insert_at + len(command)] = command
+                    ncmds, sizeofcmds = struct.unpack_from('<II', mm, header_off + 16)
+                    struct.pack_into('<II', mm, header_off + 16, ncmds + 1, sizeofcmds + len(command))
+                    patched += 1
+                mm.flush()
+            if patched: self._invalidate_macho(binary_path)
+        except (OSError, ValueError, struct.error) as e:
+            self.logger.debug(f"Fast dylib injection unavailable: {e}", binary=str(binary_path))
+            return False
+        self.logger.info(f"Injected '{dylib_path}' in place into {patched} of {len(slices)} architecture(s)")
+        return True
+
+    def _parse_macho(self, binary_path: Path):
+        """Parse a Mach-O with LIEF, memoized on (path, mtime, size) so repeated inspection doesn't re-read the binary"""
+        st = binary_path.stat()
+        key = (str(binary_path), st.st_mtime_ns, st.st_size)
+        fat_binary = self._macho_cache.get(key)
+        if fat_binary is None:
+            self.logger.info(f"Parsing Mach-O binary at {binary_path}")
+            fat_binary = lief.MachO.parse(str(binary_path))
+            if fat_binary: self._macho_cache[key] = fat_binary
+        return fat_binary
+
+    def _write_macho(self, fat_binary, binary_path: Path):
+        # The cached object has been mutated, so drop it even if the write fails
+        try: fat_binary.write(str(binary_path))
+        finally: self._invalidate_macho(binary_path)
+
+    def _invalidate_macho(self, binary_path: Path):
+        for key in [k for k in self._macho_cache if k[0] == str(binary_path)]: del self._macho_cache[key]
+
+    def _inject_libraries_with_lief(self, main_binary_path: Path, injected_libraries: List[str]):
+        """Inject load commands through a full LIEF parse/rewrite of the binary"""
+        fat_binary = self._parse_macho(main_binary_path)
+
+        if not fat_binary:
+            raise ValueError("LIEF failed to parse the main binary.")
+
+        # Handle fat binaries by iterating through architectures
+        if isinstance(fat_binary, lief.MachO.FatBinary):
+            slices = list(fat_binary)
+            cpu_types = []
+            for binary in slices:
+                try: cpu_types.append(int(binary.header.cpu_type))
+                except Exception as e:
+                    self.logger.warning(f"Error checking CPU type: {e}")
+                    cpu_types.append(None)
+            # iOS 11+ only runs arm64, so 32-bit ARM slices are only patched when there is no arm64 slice
+            target_type = CPU_TYPE_ARM64 if CPU_TYPE_ARM64 in cpu_types else CPU_TYPE_ARM
+            binaries_to_patch = [b for b, cpu in zip(slices, cpu_types) if cpu in (target_type, None)]
+            
+            if not binaries_to_patch:
+                # Try to patch all binaries if no ARM found
+                binaries_to_patch = slices
+                self.logger.warning("No ARM architectures detected, will patch all architectures")
+            
+            self.logger.info(f"Fat binary detected. Will patch {len(binaries_to_patch)} of {len(slices)} architectures.")
+        else:
+            binaries_to_patch = [fat_binary]
+
+        # Build the load commands once and add them directly, in the given order (dyld loads them in command order)
+        commands = [(path, lief.MachO.DylibCommand.load_dylib(path)) for path in injected_libraries]
+        for binary_to_patch in binaries_to_patch:
+            cpu_info = getattr(binary_to_patch.header, 'cpu_type', 'unknown')
+            for injection_path, command in commands:
+                try:
+                    binary_to_patch.add(command)
+                    self.logger.info(f"Injected '{injection_path}' into architecture {cpu_info}")
+                except Exception as e:
+                    self.logger.warning(f"Failed to inject {injection_path}: {e}")
+
+        # Write the patched binary
+        self._write_macho(fat_binary, main_binary_path)
+        self.logger.info("Successfully injected all libraries into binary.")
+
+    def patch_ipa_with_data_tar(self, ipa_path_str: str, data_tar_path_str: str,
+                                preextracted_tar_path: Optional[Path] = None, scratch_dir: Optional[Path] = None):
+        """Enhanced patching function that can handle data.tar and various tar formats.
+        Callers that already unpacked the tar can pass preextracted_tar_path (and their scratch_dir) to skip re-extraction"""
         if not LIEF_AVAILABLE:
             self.logger.error("LIEF library not found. Please install it by running: pip install lief")
             self._notify_progress('operation', 'failed', error="Patching engine (LIEF) not found. Please run 'pip install lief' in your terminal.")
@@ -273,22 +795,21 @@ class DebMaster:
             self.logger.error(f"Data tar file not found: {data_tar_path}")
             return
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            self.logger.info(f"Created temporary directory: {temp_dir}")
+        with (contextlib.nullcontext(str(scratch_dir)) if scratch_dir else tempfile.TemporaryDirectory()) as temp_dir:
+            self.logger.info(f"Using temporary directory: {temp_dir}")
             self._notify_progress('patch', 'started', ipa=ipa_path.name, data_tar=data_tar_path.name)
             
             # Setup subdirectories
             base_path = Path(temp_dir)
             ipa_extract_path = base_path / 'ipa_extracted'
-            tar_extract_path = base_path / 'tar_extracted'
+            tar_extract_path = preextracted_tar_path or base_path / 'tar_extracted'
             ipa_extract_path.mkdir()
-            tar_extract_path.mkdir()
+            tar_extract_path.mkdir(exist_ok=True)
 
             try:
                 # Extract IPA
                 self._notify_progress('patch', 'extracting_ipa')
-                with zipfile.ZipFile(ipa_path, 'r') as ipa_zip:
-                    ipa_zip.extractall(ipa_extract_path)
+                self._extract_zip_parallel(ipa_path, ipa_extract_path)
                 
                 app_bundle_path = next((p for p in (ipa_extract_path / 'Payload').iterdir() if p.suffix == '.app'), None)
                 if not app_bundle_path:
@@ -300,10 +821,14 @@ class DebMaster:
                     raise FileNotFoundError(f"Could not find main binary: {main_binary_path}")
                 
                 self.logger.info(f"Found app bundle: {app_bundle_path.name}, binary: {main_binary_path.name}")
+                # Paths written by the patcher; everything else is copied raw from the source IPA on repack
+                modified_paths = [main_binary_path]
 
                 # Extract data.tar or tar file
                 self._notify_progress('patch', 'extracting_tar')
-                if not self._extract_tar_archive(data_tar_path, tar_extract_path):
+                if preextracted_tar_path:
+                    self.logger.info(f"Reusing extracted tar contents at {preextracted_tar_path}")
+                elif not self._extract_tar_archive(data_tar_path, tar_extract_path):
                     raise Exception("Failed to extract tar archive")
 
                 # Analyze the extracted tweak structure
@@ -320,6 +845,7 @@ class DebMaster:
                 for dylib_path in tweak_analysis['dylibs']:
                     target_dylib_path = app_bundle_path / dylib_path.name
                     shutil.copy(dylib_path, target_dylib_path)
+                    modified_paths.append(target_dylib_path)
                     injected_libraries.append(f"@executable_path/{dylib_path.name}")
                     self.logger.info(f"Copied dylib: {dylib_path.name}")
 
@@ -329,7 +855,8 @@ class DebMaster:
                         target_framework_path = app_bundle_path / framework_path.name
                         if target_framework_path.exists():
                             shutil.rmtree(target_framework_path)
-                        shutil.copytree(framework_path, target_framework_path)
+                        self._move_tree(framework_path, target_framework_path)
+                        modified_paths.append(target_framework_path)
                         # For frameworks, we typically inject the main framework binary
                         framework_binary = target_framework_path / framework_path.stem
                         if framework_binary.exists():
@@ -342,72 +869,29 @@ class DebMaster:
                         target_bundle_path = app_bundle_path / bundle_path.name
                         if target_bundle_path.exists():
                             shutil.rmtree(target_bundle_path)
-                        shutil.copytree(bundle_path, target_bundle_path)
+                        self._move_tree(bundle_path, target_bundle_path)
+                        modified_paths.append(target_bundle_path)
                         self.logger.info(f"Copied bundle: {bundle_path.name}")
 
                 # Handle preference bundles (if any)
                 for pref_path in tweak_analysis['preferences']:
                     target_pref_path = app_bundle_path / pref_path.name
                     shutil.copy(pref_path, target_pref_path)
+                    modified_paths.append(target_pref_path)
                     self.logger.info(f"Copied preference file: {pref_path.name}")
 
                 if not injected_libraries:
                     raise Exception("No libraries found to inject into the binary")
 
-                # Inject libraries into the main binary using LIEF
+                # Inject libraries in place while the load-command padding has room; from the first one that doesn't
+                # fit, the rest go to LIEF so the load commands keep the tweak's order
                 self._notify_progress('patch', 'injecting_libraries')
-                self.logger.info(f"Parsing Mach-O binary at {main_binary_path}")
-                fat_binary = lief.MachO.parse(str(main_binary_path))
-                
-                if not fat_binary:
-                    raise ValueError("LIEF failed to parse the main binary.")
-
-                # Handle fat binaries by iterating through architectures
-                if isinstance(fat_binary, lief.MachO.FatBinary):
-                    binaries_to_patch = []
-                    for binary in fat_binary:
-                        try:
-                            # Try different ways to access CPU types based on LIEF version
-                            cpu_type = None
-                            if hasattr(lief.MachO, 'CPU_TYPES'):
-                                cpu_type = binary.header.cpu_type
-                                target_types = [lief.MachO.CPU_TYPES.ARM64, lief.MachO.CPU_TYPES.ARM]
-                            elif hasattr(lief, 'MachO') and hasattr(lief.MachO, 'CPU_TYPE'):
-                                cpu_type = binary.header.cpu_type
-                                target_types = [lief.MachO.CPU_TYPE.ARM64, lief.MachO.CPU_TYPE.ARM]
-                            elif hasattr(binary.header, 'cpu_type'):
-                                cpu_type = binary.header.cpu_type
-                                # Use numeric values as fallback (ARM64=12, ARM=7)
-                                target_types = [12, 7]
-                            
-                            if cpu_type and cpu_type in target_types:
-                                binaries_to_patch.append(binary)
-                        except Exception as e:
-                            self.logger.warning(f"Error checking CPU type: {e}")
-                            binaries_to_patch.append(binary)  # Add anyway as fallback
-                    
-                    if not binaries_to_patch:
-                        # Try to patch all binaries if no ARM found
-                        binaries_to_patch = list(fat_binary)
-                        self.logger.warning("No ARM architectures detected, will patch all architectures")
-                    
-                    self.logger.info(f"Fat binary detected. Will patch {len(binaries_to_patch)} architectures.")
+                pending_libraries = list(injected_libraries)
+                while pending_libraries and self._try_fast_inject_dylib(main_binary_path, pending_libraries[0]): pending_libraries.pop(0)
+                if pending_libraries:
+                    self._inject_libraries_with_lief(main_binary_path, pending_libraries)
                 else:
-                    binaries_to_patch = [fat_binary]
-
-                # Inject all libraries into each binary architecture
-                for binary_to_patch in binaries_to_patch:
-                    for injection_path in injected_libraries:
-                        try:
-                            binary_to_patch.add_library(injection_path)
-                            cpu_info = getattr(binary_to_patch.header, 'cpu_type', 'unknown')
-                            self.logger.info(f"Injected '{injection_path}' into architecture {cpu_info}")
-                        except Exception as e:
-                            self.logger.warning(f"Failed to inject {injection_path}: {e}")
-
-                # Write the patched binary
-                fat_binary.write(str(main_binary_path))
-                self.logger.info("Successfully injected all libraries into binary.")
+                    self.logger.info("Successfully injected all libraries into binary in place.")
 
                 # Re-package the IPA
                 self._notify_progress('patch', 'repackaging_ipa')
@@ -417,7 +901,8 @@ class DebMaster:
                 output_ipa_path = output_dir / output_ipa_name
                 
                 self.logger.info(f"Creating final IPA at {output_ipa_path}")
-                self._create_ipa(ipa_extract_path, output_ipa_path)
+                self._create_ipa(ipa_extract_path, output_ipa_path, source_ipa=ipa_path,
+                                 modified={p.relative_to(ipa_extract_path).as_posix() for p in modified_paths})
                 
                 self.logger.info("Advanced patching process completed successfully.")
                 self._notify_progress('operation', 'completed', 
@@ -442,18 +927,21 @@ class DebMaster:
         
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
+            # The deb payload gets its own subdirectory so the IPA extracted alongside it isn't scanned as tweak content
+            deb_extract_path = temp_path / 'tar_extracted'
+            deb_extract_path.mkdir()
             
             # Extract the deb file
-            self._extract_deb(tweak_deb_path, temp_path)
+            self._extract_deb(tweak_deb_path, deb_extract_path)
             
             # Look for data.tar files
-            data_tar_files = list(temp_path.glob('data.tar*'))
+            data_tar_files = list(deb_extract_path.glob('data.tar*'))
             if data_tar_files:
-                # Use the first data.tar file found
-                self.patch_ipa_with_data_tar(ipa_path_str, str(data_tar_files[0]))
+                # _extract_deb already unpacked the first data.tar, so reuse it and this scratch dir
+                self.patch_ipa_with_data_tar(ipa_path_str, str(data_tar_files[0]), preextracted_tar_path=deb_extract_path, scratch_dir=temp_path)
             else:
                 # Fallback to original method for direct dylib injection
-                self._legacy_patch_ipa_with_tweak(ipa_path_str, tweak_deb_path_str, temp_path)
+                self._legacy_patch_ipa_with_tweak(ipa_path_str, tweak_deb_path_str, deb_extract_path)
 
     def _legacy_patch_ipa_with_tweak(self, ipa_path_str: str, tweak_deb_path_str: str, extracted_path: Path):
         """Original patching method for backward compatibility"""
@@ -471,8 +959,7 @@ class DebMaster:
 
             # Extract IPA
             self._notify_progress('patch', 'extracting_ipa')
-            with zipfile.ZipFile(ipa_path, 'r') as ipa_zip:
-                ipa_zip.extractall(ipa_extract_path)
+            self._extract_zip_parallel(ipa_path, ipa_extract_path)
             
             app_bundle_path = next((p for p in (ipa_extract_path / 'Payload').iterdir() if p.suffix == '.app'), None)
             if not app_bundle_path: raise FileNotFoundError("Could not find .app bundle in the IPA payload.")
@@ -483,7 +970,7 @@ class DebMaster:
             self.logger.info(f"Found app bundle: {app_bundle_path.name}, binary: {main_binary_path.name}")
 
             # Find dylib in extracted tweak
-            dylib_path = next(extracted_path.glob('**/*.dylib'), None)
+            dylib_path = self._first_dylib(extracted_path)
             if not dylib_path: raise FileNotFoundError("Could not find .dylib in tweak files.")
             self.logger.info(f"Found tweak dylib: {dylib_path.name}")
 
@@ -492,53 +979,44 @@ class DebMaster:
             shutil.copy(dylib_path, target_dylib_path)
             self.logger.info(f"Copied dylib to {target_dylib_path}")
 
-            # Inject dylib into the main binary using LIEF
+            # Inject dylib into the main binary, in place when possible, otherwise using LIEF
             self._notify_progress('patch', 'injecting_dylib')
-            self.logger.info(f"Parsing Mach-O binary at {main_binary_path}")
-            fat_binary = lief.MachO.parse(str(main_binary_path))
-            if not fat_binary: raise ValueError("LIEF failed to parse the main binary.")
-
-            # Handle fat binaries by iterating through architectures
-            if isinstance(fat_binary, lief.MachO.FatBinary):
-                binary_to_patch = None
-                for binary in fat_binary:
-                    try:
-                        # Try different ways to access CPU types based on LIEF version
-                        cpu_type = binary.header.cpu_type
-                        
-                        # Check for ARM64 using different API approaches
-                        is_arm64 = False
-                        if hasattr(lief.MachO, 'CPU_TYPES') and hasattr(lief.MachO.CPU_TYPES, 'ARM64'):
-                            is_arm64 = (cpu_type == lief.MachO.CPU_TYPES.ARM64)
-                        elif hasattr(lief, 'MachO') and hasattr(lief.MachO, 'CPU_TYPE') and hasattr(lief.MachO.CPU_TYPE, 'ARM64'):
-                            is_arm64 = (cpu_type == lief.MachO.CPU_TYPE.ARM64)
-                        elif cpu_type == 12:  # ARM64 = 12 (fallback to numeric value)
-                            is_arm64 = True
-                        
-                        if is_arm64:
-                            binary_to_patch = binary
-                            self.logger.info("Fat binary detected. Selected ARM64 slice.")
-                            break
-                    except Exception as e:
-                        self.logger.warning(f"Error checking CPU type: {e}")
-                        continue
-                        
-                if not binary_to_patch:
-                    # Fallback: use first binary
-                    binary_to_patch = next(iter(fat_binary), None)
-                    if binary_to_patch:
-                        self.logger.warning("Could not find ARM64 slice, using first available architecture.")
-                    else:
-                        raise ValueError("Could not find any binary slice in the fat binary.")
+            injection_path = f"@executable_path/{target_dylib_path.name}"
+            if self._try_fast_inject_dylib(main_binary_path, injection_path):
+                self.logger.info(f"Successfully injected '{injection_path}' into binary in place.")
             else:
-                binary_to_patch = fat_binary
+                fat_binary = self._parse_macho(main_binary_path)
+                if not fat_binary: raise ValueError("LIEF failed to parse the main binary.")
 
-            injection_path = f"@executable_path/{target_dylib_path.name}"
-            binary_to_patch.add_library(injection_path)
+                # Handle fat binaries by iterating through architectures
+                if isinstance(fat_binary, lief.MachO.FatBinary):
+                    binary_to_patch = None
+                    for binary in fat_binary:
+                        try:
+                            # Enum names differ across LIEF versions, so compare the raw Mach-O cpu_type value
+                            if int(binary.header.cpu_type) == CPU_TYPE_ARM64:
+                                binary_to_patch = binary
+                                self.logger.info("Fat binary detected. Selected ARM64 slice.")
+                                break
+                        except Exception as e:
+                            self.logger.warning(f"Error checking CPU type: {e}")
+                            continue
+                        
+                    if not binary_to_patch:
+                        # Fallback: use first binary
+                        binary_to_patch = next(iter(fat_binary), None)
+                        if binary_to_patch:
+                            self.logger.warning("Could not find ARM64 slice, using first available architecture.")
+                        else:
+                            raise ValueError("Could not find any binary slice in the fat binary.")
+                else:
+                    binary_to_patch = fat_binary
+
+                binary_to_patch.add_library(injection_path)
             
-            # Overwrite the original binary with the patched version
-            fat_binary.write(str(main_binary_path))
-            self.logger.info(f"Successfully injected '{injection_path}' into binary.")
+                # Overwrite the original binary with the patched version
+                self._write_macho(fat_binary, main_binary_path)
+                self.logger.info(f"Successfully injected '{injection_path}' into binary.")
 
             # Re-package the IPA
             self._notify_progress('patch', 'repackaging_ipa')
@@ -548,50 +1026,84 @@ class DebMaster:
             output_ipa_path = output_dir / output_ipa_name
             
             self.logger.info(f"Creating final IPA at {output_ipa_path}")
-            self._create_ipa(ipa_extract_path, output_ipa_path)
+            self._create_ipa(ipa_extract_path, output_ipa_path, source_ipa=ipa_path,
+                             modified={p.relative_to(ipa_extract_path).as_posix() for p in (main_binary_path, target_dylib_path)})
             
             self.logger.info("Patching process completed successfully.")
             self._notify_progress('operation', 'completed', final_path=str(output_ipa_path))
 
-async def main():
-    parser = argparse.ArgumentParser(description='DebMaster - DEB to IPA Converter & Advanced Patcher')
-    parser.add_argument('--github', help='GitHub repository URL')
-    parser.add_argument('--convert', help='Local .deb file to convert')
-    parser.add_argument('--download-url', help='URL of .deb file to download and convert')
-    parser.add_argument('--patch', help='Path to the base .ipa file to be patched')
-    parser.add_argument('--with-tweak', help='Path to the tweak .deb file')
-    parser.add_argument('--with-data-tar', help='Path to data.tar or tar file for advanced patching')
-    parser.add_argument('--config', default='debmaster_config.json')
-    parser.add_argument('--verbose', '-v', action='store_true')
-    args = parser.parse_args()
+# Printed after --help output when no operation is given; one write instead of a print per line
+HELP_EXAMPLES = (
+    "\nExamples:\n"
+    "  # Patch IPA with data.tar file:\n"
+    "  python debmaster.py --patch app.ipa --with-data-tar data.tar\n"
+    "  # Patch IPA with .deb file (legacy):\n"
+    "  python debmaster.py --patch app.ipa --with-tweak tweak.deb\n"
+)
+_parser: Optional[argparse.ArgumentParser] = None
 
+def _get_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser once and reuse it for later calls (e.g. when main() is driven from a test harness)"""
+    global _parser
+    if _parser is None:
+        parser = argparse.ArgumentParser(description='DebMaster - DEB to IPA Converter & Advanced Patcher')
+        parser.add_argument('--github', help='GitHub repository URL')
+        parser.add_argument('--convert', help='Local .deb file to convert')
+        parser.add_argument('--download-url', nargs='+', help='URL(s) of .deb files to download and convert')
+        parser.add_argument('--patch', help='Path to the base .ipa file to be patched')
+        parser.add_argument('--with-tweak', help='Path to the tweak .deb file')
+        parser.add_argument('--with-data-tar', help='Path to data.tar or tar file for advanced patching')
+        parser.add_argument('--extract-concurrency', type=int, help='Parallel file writes when extracting tweak payloads (default 1)')
+        parser.add_argument('--config', default='debmaster_config.json')
+        parser.add_argument('--verbose', '-v', action='store_true')
+        _parser = parser
+    return _parser
+
+def _cli() -> argparse.Namespace:
+    """Parse the command line synchronously; --help and usage errors exit here without starting an event loop"""
+    return _get_parser().parse_args()
+
+async def _run(args: argparse.Namespace) -> int:
     async with DebMaster(config_path=args.config) as manager:
+        if args.extract_concurrency: manager.config['extract_concurrency'] = args.extract_concurrency
         try:
             if args.github: 
                 await manager.fetch_github_releases(args.github)
-            elif args.download_url: 
-                await manager.download_and_convert(args.download_url)
+            elif args.download_url and len(args.download_url) == 1:
+                await manager.download_and_convert(args.download_url[0])
+            elif args.download_url:
+                results = await manager.download_and_convert_many(args.download_url)
+                if any(isinstance(r, Exception) for r in results): return 1
             elif args.convert: 
-                manager.convert_deb_to_ipa(Path(args.convert), download_url=f"local:{args.convert}")
+                await asyncio.to_thread(manager.convert_deb_to_ipa, Path(args.convert), None, f"local:{args.convert}")
             elif args.patch and args.with_data_tar:
-                manager.patch_ipa_with_data_tar(args.patch, args.with_data_tar)
+                await asyncio.to_thread(manager.patch_ipa_with_data_tar, args.patch, args.with_data_tar)
             elif args.patch and args.with_tweak: 
-                manager.patch_ipa_with_tweak(args.patch, args.with_tweak)
+                await asyncio.to_thread(manager.patch_ipa_with_tweak, args.patch, args.with_tweak)
             else: 
-                parser.print_help()
-                print("\nExamples:")
-                print("  # Patch IPA with data.tar file:")
-                print("  python debmaster.py --patch app.ipa --with-data-tar data.tar")
-                print("  # Patch IPA with .deb file (legacy):")
-                print("  python debmaster.py --patch app.ipa --with-tweak tweak.deb")
-        except TweakDetectedException: 
-            sys.exit(0)
+                sys.stdout.write(_get_parser().format_help() + HELP_EXAMPLES)
         except Exception as e:
-            manager.logger.error(f"A fatal error occurred in main: {str(e)}", exc_info=args.verbose)
+            manager.logger.error("A fatal error occurred in main: %s", e, exc_info=args.verbose)
             manager._notify_progress('fatal_error', 'failed', error=str(e))
-            sys.exit(1)
+            return 1
+    return 0
 
-if __name__ == "__main__":
+def main():
+    args = _cli()
+    # Only pay for an event loop (and the DebMaster/aiohttp setup) when there is an operation to run
+    if not (args.github or args.download_url or args.convert or (args.patch and (args.with_data_tar or args.with_tweak))):
+        sys.stdout.write(_get_parser().format_help() + HELP_EXAMPLES)
+        return
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(main())
+    if UVLOOP_AVAILABLE and sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner: code = runner.run(_run(args))
+    elif UVLOOP_AVAILABLE:
+        uvloop.install()
+        code = asyncio.run(_run(args))
+    else:
+        code = asyncio.run(_run(args))
+    if code: sys.exit(code)
+
+if __name__ == "__main__":
+    main()